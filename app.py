@@ -1,50 +1,28 @@
-import os
-import pandas as pd
+import numpy as np
 import streamlit as st
-from supabase import create_client, Client
-from difflib import SequenceMatcher
 from datetime import date
 
-st.set_page_config(page_title="Org Requests Dashboard", layout="wide")
+from common import (
+    DATE_COLUMNS,
+    apply_dropdown_filters,
+    chunked,
+    get_org_contact,
+    get_requests_df_for_org,
+    io_pool,
+    org_label,
+    pg_org_link,
+    require_auth,
+    sb,
+    session_memo,
+    with_all,
+)
 
-APP_PASSWORD = (st.secrets.get("APP_PASSWORD", "") if hasattr(st, "secrets") else "")
-SUPABASE_URL = (st.secrets.get("SUPABASE_URL", "") if hasattr(st, "secrets") else "")
-SUPABASE_KEY = (st.secrets.get("SUPABASE_KEY", "") if hasattr(st, "secrets") else "")
+st.set_page_config(page_title="Org Requests Dashboard", layout="wide")
 
 PAGE_SIZE = 5
+ORG_BATCH_SIZE = 200  # keeps the in_() query string well under gateway URL limits
 
-def _auth_ui():
-    st.markdown("# Sign in")
-    st.caption("Enter the shared password to access this dashboard.")
-
-    pw = st.text_input("Password", type="password", key="pw_input")
-    login = st.button("Login", use_container_width=True)
-
-    if login:
-        if not APP_PASSWORD:
-            st.error("APP_PASSWORD is not set in secrets.toml.")
-            st.stop()
-
-        if pw == APP_PASSWORD:
-            st.session_state["authed"] = True
-            st.rerun()
-        else:
-            st.error("Wrong password.")
-
-if APP_PASSWORD:
-    if "authed" not in st.session_state:
-        st.session_state["authed"] = False
-
-    if not st.session_state["authed"]:
-        _auth_ui()
-        st.stop()
-
-@st.cache_resource
-def sb() -> Client:
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        st.error("Missing SUPABASE_URL or SUPABASE_KEY. Add them to secrets.toml.")
-        st.stop()
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+require_auth()
 
 client = sb()
 
@@ -56,59 +34,10 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Helpers
-def is_int(s: str) -> bool:
-    try:
-        int(s)
-        return True
-    except Exception:
-        return False
-
-def similarity(a: str, b: str) -> float:
-    return SequenceMatcher(None, (a or "").lower(), (b or "").lower()).ratio()
-
-def chunked(lst, n):
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
-
-def pg_org_link(org_id: int) -> str:
-    url = f"https://www.perfectgame.org/PGBA/Team/default.aspx?orgid={org_id}"
-    return f'<a href="{url}" target="_blank">{org_id}</a>'
-
-@st.cache_data(ttl=60)
-def get_requests_for_org(org_id: int):
-    res = (
-        client.table("requests")
-        .select(
-            "organization_id, organization_year_id, team_name, date_requested, tag_level, event_name, "
-            "start_date_calendar_year, start_date, event_schedule_group_id, event_id, "
-            "accountingregionid, accountinggroupid, orgcontactname, orgcontactemail, "
-            "orgcontactphone, registration_status, updated_at"
-        )
-        .eq("organization_id", org_id)
-        .order("start_date", desc=False)
-        .execute()
-    )
-    return res.data or []
-
-def with_all(options):
-    opts = sorted([o for o in options if o not in (None, "", "nan")])
-    return ["All"] + opts
-
-def apply_dropdown_filters(d: pd.DataFrame, status_choice: str, event_choice: str) -> pd.DataFrame:
-    out = d.copy()
-    if status_choice != "All":
-        out = out[out["registration_status"] == status_choice]
-    if event_choice != "All":
-        out = out[out["event_name"] == event_choice]
-    return out
-
-@st.cache_data(ttl=60)
 def fetch_reps():
     res = client.table("reps").select("rep_id, rep_name").order("rep_name").execute()
     return res.data or []
 
-@st.cache_data(ttl=60)
 def fetch_org_ids_for_rep(rep_id: int):
     res = (
         client.table("org_rep_assignments")
@@ -120,28 +49,43 @@ def fetch_org_ids_for_rep(rep_id: int):
     rows = res.data or []
     return sorted({int(r["org_id"]) for r in rows if r.get("org_id") is not None})
 
-@st.cache_data(ttl=60)
+def _fetch_org_batch(batch):
+    res = (
+        client.table("orgs")
+        .select("organization_id, organization_name, org_city, org_state")
+        .in_("organization_id", batch)
+        .execute()
+    )
+    return res.data or []
+
 def fetch_org_details(org_ids):
     if not org_ids:
         return []
+    # Batches run concurrently; sorting here keeps Python string order (not the DB collation).
     out = []
-    for batch in chunked(org_ids, 200):
-        res = (
-            client.table("orgs")
-            .select("organization_id, organization_name, org_city, org_state")
-            .in_("organization_id", batch)
-            .execute()
-        )
-        out.extend(res.data or [])
+    for rows in io_pool().map(_fetch_org_batch, chunked(org_ids, ORG_BATCH_SIZE)):
+        out.extend(rows)
     out.sort(key=lambda r: (r.get("organization_name") or "", r.get("organization_id") or 0))
     return out
 
+# The raw queries above are uncached; each label dict below is the single 60s cache for
+# its list, so labels are formatted once per TTL and map straight back to their row.
+# cache_resource hands back the same dict each rerun; treat it as read-only.
+@st.cache_resource(ttl=60)
+def fetch_rep_options():
+    return {f'{r["rep_name"]} (ID {r["rep_id"]})': r for r in fetch_reps()}
+
+# Rep-specific, so memoized per browser session; concurrent users on different reps
+# don't evict each other.
+@session_memo(ttl=60)
+def fetch_org_options(rep_id: int):
+    return {org_label(o): o for o in fetch_org_details(fetch_org_ids_for_rep(rep_id))}
+
 def render_org_insights(selected_org, org_id: int):
     org_name = selected_org.get("organization_name", "(no name)")
     st.markdown(f'### {org_name} — Org ID: {pg_org_link(org_id)}', unsafe_allow_html=True)
 
-    data = get_requests_for_org(org_id)
-    df = pd.DataFrame(data)
+    df = get_requests_df_for_org(org_id)
 
     if df.empty:
         st.info("No requests found for this org.")
@@ -149,22 +93,16 @@ def render_org_insights(selected_org, org_id: int):
 
     st.markdown("### Contact")
 
-    contact_row = df[df["orgcontactname"].notna()].head(1)
-    if contact_row.empty:
+    contact_name = get_org_contact(org_id)
+    if contact_name is None:
         st.caption("No contact info found for this org.")
-    else:
-        c = contact_row.iloc[0]
-        if c.get("orgcontactname"):
-            st.write(c["orgcontactname"])
-
-    df["start_date_calendar_year"] = pd.to_numeric(df.get("start_date_calendar_year"), errors="coerce")
-    df["start_date"] = pd.to_datetime(df.get("start_date"), errors="coerce").dt.date
-    df["date_requested"] = pd.to_datetime(df.get("date_requested"), errors="coerce").dt.date
+    elif contact_name:
+        st.write(contact_name)
 
     st.markdown("### Filters")
 
-    status_options = with_all(df["registration_status"].dropna().unique())
-    event_options = with_all(df["event_name"].dropna().unique())
+    status_options = with_all(df["registration_status"].cat.categories)
+    event_options = with_all(df["event_name"].cat.categories)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -174,26 +112,30 @@ def render_org_insights(selected_org, org_id: int):
 
     df = apply_dropdown_filters(df, status_choice, event_choice)
 
-    df_2025 = df[df["start_date_calendar_year"] == 2025]
-    df_2026 = df[df["start_date_calendar_year"] == 2026]
-
-    count_2025 = len(df_2025)
-    count_2026 = len(df_2026)
-    yoy_delta = count_2026 - count_2025
+    year = df["start_date_calendar_year"].to_numpy(dtype="int16", na_value=0)
+    is_2025 = year == 2025
+    is_2026 = year == 2026
+    # One bucket per row (0 = 2025, 1 = 2026, 2 = other) so each count is a single bincount pass.
+    bucket = np.where(is_2025, 0, np.where(is_2026, 1, 2))
 
     today = date.today()
     cutoff_2025 = date(2025, today.month, today.day)
 
-    df_2025_ytd = df_2025[df_2025["date_requested"].notna() & (df_2025["date_requested"] <= cutoff_2025)]
-    df_2026_ytd = df_2026[df_2026["date_requested"].notna() & (df_2026["date_requested"] <= today)]
+    # NaT dates compare False, so rows without date_requested never count toward YTD.
+    cutoff = np.where(is_2026, np.datetime64(today, "ns"), np.datetime64(cutoff_2025, "ns"))
+    in_ytd = df["date_requested"].to_numpy() <= cutoff
 
-    ytd_delta = len(df_2026_ytd) - len(df_2025_ytd)
+    count_2025, count_2026, _ = np.bincount(bucket, minlength=3).tolist()
+    ytd_2025, ytd_2026, _ = np.bincount(bucket[in_ytd], minlength=3).tolist()
+
+    yoy_delta = count_2026 - count_2025
+    ytd_delta = ytd_2026 - ytd_2025
 
     s2, s3 = st.columns(2)
     with s2:
         a, b = st.columns(2)
         a.metric("2025 Requests", count_2025)
-        b.metric(f"2025 YTD (thru {cutoff_2025.strftime('%b %d')})", len(df_2025_ytd), delta=ytd_delta)
+        b.metric(f"2025 YTD (thru {cutoff_2025.strftime('%b %d')})", ytd_2025, delta=ytd_delta)
     s3.metric("2026 Requests (YoY)", count_2026, delta=yoy_delta)
 
     tab25, tab26, taball = st.tabs(["2025 Requests", "2026 Requests", "All (Filtered)"])
@@ -215,52 +157,43 @@ def render_org_insights(selected_org, org_id: int):
     ]
 
     with tab25:
-        st.dataframe(df_2025[cols_show], use_container_width=True)
+        st.dataframe(df.loc[is_2025, cols_show], use_container_width=True, column_config=DATE_COLUMNS)
     with tab26:
-        st.dataframe(df_2026[cols_show], use_container_width=True)
+        st.dataframe(df.loc[is_2026, cols_show], use_container_width=True, column_config=DATE_COLUMNS)
     with taball:
-        st.dataframe(df[cols_show], use_container_width=True)
+        st.dataframe(df[cols_show], use_container_width=True, column_config=DATE_COLUMNS)
 
 # ----------------------------
 # Orgs by Person
 # ----------------------------
 st.markdown("### Orgs by Person")
 
-reps = fetch_reps()
-if not reps:
+rep_options = fetch_rep_options()
+if not rep_options:
     st.warning("No people found. (Create reps + assignments tables + import sheet first.)")
     st.stop()
 
-rep_labels = [f'{r["rep_name"]} (ID {r["rep_id"]})' for r in reps]
-
-rep_choice = st.selectbox("Select Person", ["-- Select --"] + rep_labels, index=0)
+rep_choice = st.selectbox("Select Person", ["-- Select --"] + list(rep_options), index=0)
 
 if rep_choice == "-- Select --":
     st.stop()
 
-rep = reps[rep_labels.index(rep_choice)]
+rep = rep_options[rep_choice]
 rep_id = int(rep["rep_id"])
 
-org_ids = fetch_org_ids_for_rep(rep_id)
-if not org_ids:
+org_options = fetch_org_options(rep_id)
+if not org_options:
     st.info("No assigned orgs for this person.")
     st.stop()
 
-org_details = fetch_org_details(org_ids)
-
 st.markdown("### Assigned Orgs")
 
-org_options = [
-    f'{o["organization_id"]} — {o.get("organization_name","(no name)")} ({o.get("org_city","")}, {o.get("org_state","")})'
-    for o in org_details
-]
-
-choice = st.selectbox("Select an org to view insights", ["-- Select --"] + org_options, index=0, key="rep_org_pick")
+choice = st.selectbox("Select an org to view insights", ["-- Select --"] + list(org_options), index=0, key="rep_org_pick")
 
 if choice == "-- Select --":
     st.stop()
 
-selected_org = org_details[org_options.index(choice)]
+selected_org = org_options[choice]
 org_id = int(selected_org["organization_id"])
 
 render_org_insights(selected_org, org_id)
\ No newline at end of file
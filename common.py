@@ -0,0 +1,206 @@
+"""Helpers shared by app.py and individual_search.py.
+
+Each helper, query and cached loader is defined once here instead of copied into both pages.
+"""
+import functools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from supabase import create_client, Client
+
+APP_PASSWORD = (st.secrets.get("APP_PASSWORD", "") if hasattr(st, "secrets") else "")
+SUPABASE_URL = (st.secrets.get("SUPABASE_URL", "") if hasattr(st, "secrets") else "")
+SUPABASE_KEY = (st.secrets.get("SUPABASE_KEY", "") if hasattr(st, "secrets") else "")
+
+REQUESTS_PAGE_SIZE = 1000
+
+DATE_COLUMNS = {
+    "start_date": st.column_config.DateColumn(),
+    "date_requested": st.column_config.DateColumn(),
+}
+
+# ----------------------------
+# Password Gate
+# ----------------------------
+def _auth_ui():
+    st.markdown("# Sign in")
+    st.caption("Enter the shared password to access this dashboard.")
+
+    pw = st.text_input("Password", type="password", key="pw_input")
+    login = st.button("Login", use_container_width=True)
+
+    if login:
+        if not APP_PASSWORD:
+            st.error("APP_PASSWORD is not set in secrets.toml.")
+            st.stop()
+
+        if pw == APP_PASSWORD:
+            st.session_state["authed"] = True
+            st.rerun()
+        else:
+            st.error("Wrong password.")
+
+def require_auth():
+    if APP_PASSWORD:
+        if "authed" not in st.session_state:
+            st.session_state["authed"] = False
+
+        if not st.session_state["authed"]:
+            _auth_ui()
+            st.stop()
+
+# ----------------------------
+# Supabase
+# ----------------------------
+@st.cache_resource
+def sb() -> Client:
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        st.error("Missing SUPABASE_URL or SUPABASE_KEY. Add them to secrets.toml.")
+        st.stop()
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Shared worker threads for fanning out independent queries (sync httpx clients are thread-safe).
+@st.cache_resource
+def io_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="supabase-io")
+
+# Per-browser-session memo; entries older than ttl seconds are refetched (and pruned).
+def session_memo(ttl: float):
+    def decorator(fn):
+        state_key = f"_memo_{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            if state_key not in st.session_state:
+                st.session_state[state_key] = {}
+            memo = st.session_state[state_key]
+            now = time.monotonic()
+            hit = memo.get(args)
+            if hit is not None and now - hit[0] < ttl:
+                return hit[1]
+            for k in [k for k, (t, _) in memo.items() if now - t >= ttl]:
+                del memo[k]
+            value = fn(*args)
+            memo[args] = (now, value)
+            return value
+
+        return wrapper
+    return decorator
+
+# ----------------------------
+# Helpers
+# ----------------------------
+def is_int(s: str) -> bool:
+    try:
+        int(s)
+        return True
+    except Exception:
+        return False
+
+def chunked(ids, n):
+    # Evenly sized batches of at most n integer ids, back to plain lists for the .in_() call.
+    if not len(ids):
+        return
+    for batch in np.array_split(np.asarray(ids, dtype=np.int64), math.ceil(len(ids) / n)):
+        yield batch.tolist()
+
+def pg_org_link(org_id: int) -> str:
+    url = f"https://www.perfectgame.org/PGBA/Team/default.aspx?orgid={org_id}"
+    return f'<a href="{url}" target="_blank">{org_id}</a>'
+
+def org_label(o) -> str:
+    return f'{o["organization_id"]} — {o.get("organization_name","(no name)")} ({o.get("org_city","")}, {o.get("org_state","")})'
+
+def to_day(s: pd.Series) -> pd.Series:
+    return pd.to_datetime(s, errors="coerce", utc=True).dt.tz_localize(None).dt.normalize()
+
+# ----------------------------
+# Requests
+# ----------------------------
+def get_requests_for_org(org_id: int):
+    # Page through with .range() until the row count from the first page is reached, so orgs
+    # past PostgREST's max-rows cap (whatever it is set to) aren't truncated. Only the first
+    # request asks for count=exact, so single-page orgs pay for one COUNT, not one per page.
+    out = []
+    start = 0
+    total = None
+    while total is None or start < total:
+        res = (
+            sb().table("requests")
+            .select(
+                "organization_id, team_name, date_requested, tag_level, event_name, "
+                "start_date_calendar_year, start_date, event_schedule_group_id, event_id, "
+                "orgcontactname, orgcontactemail, orgcontactphone, registration_status, updated_at",
+                count="exact" if start == 0 else None,
+            )
+            .eq("organization_id", org_id)
+            # Stable paging assumes (start_date, event_id, event_schedule_group_id,
+            # organization_year_id) is unique per org: one request per team-year per event
+            # schedule group. requests has no primary key in this tree and nothing enforces
+            # that, so duplicate keys could still shift across page boundaries.
+            .order("start_date", desc=False)
+            .order("event_id")
+            .order("event_schedule_group_id")
+            .order("organization_year_id")
+            .range(start, start + REQUESTS_PAGE_SIZE - 1)
+            .execute()
+        )
+        rows = res.data or []
+        if total is None:
+            total = res.count if res.count is not None else len(rows)
+        if not rows:
+            break
+        out.extend(rows)
+        start += len(rows)
+    return out
+
+# Typed once per org and shared as-is across reruns (cache_resource doesn't copy),
+# so callers must not mutate the returned frame.
+@st.cache_resource(ttl=60)
+def get_requests_df_for_org(org_id: int) -> pd.DataFrame:
+    df = pd.DataFrame(get_requests_for_org(org_id))
+    if df.empty:
+        return df
+    df["start_date_calendar_year"] = pd.to_numeric(df["start_date_calendar_year"], errors="coerce")
+    df["start_date"] = to_day(df["start_date"])
+    df["date_requested"] = to_day(df["date_requested"])
+    # Int16 years (2 bytes vs float64's 8) and int-coded categoricals for the low-cardinality
+    # text columns. Categories come out sorted and de-duplicated, which the filter dropdowns use.
+    return df.astype({
+        "start_date_calendar_year": "Int16",
+        "registration_status": "category",
+        "event_name": "category",
+        "tag_level": "category",
+    })
+
+@st.cache_data(ttl=60)
+def get_org_contact(org_id: int):
+    # Postgres finds the first named contact; no need to scan the whole request frame for it.
+    res = (
+        sb().table("requests")
+        .select("orgcontactname")
+        .eq("organization_id", org_id)
+        .not_.is_("orgcontactname", "null")
+        .order("start_date", desc=False)
+        .limit(1)
+        .execute()
+    )
+    rows = res.data or []
+    return rows[0]["orgcontactname"] if rows else None
+
+def with_all(categories):
+    return ["All"] + [c for c in categories if c not in (None, "", "nan")]
+
+def apply_dropdown_filters(d: pd.DataFrame, status_choice: str, event_choice: str) -> pd.DataFrame:
+    if status_choice == "All" and event_choice == "All":
+        return d
+    mask = np.ones(len(d), dtype=bool)
+    if status_choice != "All":
+        mask &= (d["registration_status"] == status_choice).to_numpy()
+    if event_choice != "All":
+        mask &= (d["event_name"] == event_choice).to_numpy()
+    return d[mask]
@@ -1,56 +1,27 @@
-import os
-import pandas as pd
+import numpy as np
 import streamlit as st
-from supabase import create_client, Client
-from difflib import SequenceMatcher
-from datetime import date
+from rapidfuzz import fuzz, process
+
+from common import (
+    DATE_COLUMNS,
+    apply_dropdown_filters,
+    get_org_contact,
+    get_requests_df_for_org,
+    is_int,
+    org_label,
+    pg_org_link,
+    require_auth,
+    sb,
+    with_all,
+)
 
 st.set_page_config(page_title="Org Requests Dashboard", layout="wide")
 
-APP_PASSWORD = (st.secrets.get("APP_PASSWORD", "") if hasattr(st, "secrets") else "")
-SUPABASE_URL = (st.secrets.get("SUPABASE_URL", "") if hasattr(st, "secrets") else "")
-SUPABASE_KEY = (st.secrets.get("SUPABASE_KEY", "") if hasattr(st, "secrets") else "")
-
 PAGE_SIZE = 10  # ✅ limit to 10 orgs per search page
+ORG_SEARCH_LIMIT = 200
+MIN_RANKED_QUERY_LEN = 3
 
-# ----------------------------
-# Password Gate
-# ----------------------------
-def _auth_ui():
-    st.markdown("# Sign in")
-    st.caption("Enter the shared password to access this dashboard.")
-
-    pw = st.text_input("Password", type="password", key="pw_input")
-    login = st.button("Login", use_container_width=True)
-
-    if login:
-        if not APP_PASSWORD:
-            st.error("APP_PASSWORD is not set in secrets.toml.")
-            st.stop()
-
-        if pw == APP_PASSWORD:
-            st.session_state["authed"] = True
-            st.rerun()
-        else:
-            st.error("Wrong password.")
-
-if APP_PASSWORD:
-    if "authed" not in st.session_state:
-        st.session_state["authed"] = False
-
-    if not st.session_state["authed"]:
-        _auth_ui()
-        st.stop()
-
-# ----------------------------
-# Supabase
-# ----------------------------
-@st.cache_resource
-def sb() -> Client:
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        st.error("Missing SUPABASE_URL or SUPABASE_KEY.")
-        st.stop()
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+require_auth()
 
 client = sb()
 
@@ -65,27 +36,6 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# ----------------------------
-# Helpers
-# ----------------------------
-def is_int(s: str) -> bool:
-    try:
-        int(s)
-        return True
-    except Exception:
-        return False
-
-def similarity(a: str, b: str) -> float:
-    return SequenceMatcher(None, (a or "").lower(), (b or "").lower()).ratio()
-
-def chunked(lst, n):
-    for i in range(0, len(lst), n):
-        yield lst[i:i + n]
-
-def pg_org_link(org_id: int) -> str:
-    url = f"https://www.perfectgame.org/PGBA/Team/default.aspx?orgid={org_id}"
-    return f'<a href="{url}" target="_blank">{org_id}</a>'
-
 # ----------------------------
 # Queries
 # ----------------------------
@@ -104,50 +54,24 @@ def fetch_org_candidates(query: str):
         )
         return res.data or []
 
-    res = (
-        client.table("orgs")
-        .select("organization_id, organization_name, org_city, org_state")
-        .ilike("organization_name", f"%{query}%")
-        .limit(200)
-        .execute()
+    # search_orgs (supabase/migrations) filters + trigram-ranks server-side.
+    res = client.rpc("search_orgs", {"q": query, "lim": ORG_SEARCH_LIMIT}).execute()
+
+    # Shorter names first so equal scores keep the old length tie-break
+    # (process.extract orders ties by input position).
+    rows = sorted(res.data or [], key=lambda o: len(o.get("organization_name") or ""))
+    # 1-2 character queries carry too little signal to rank on; shortest names first is enough.
+    if len(query) < MIN_RANKED_QUERY_LEN:
+        return rows
+    names = [o.get("organization_name") or "" for o in rows]
+    scored = process.extract(
+        query,
+        names,
+        scorer=fuzz.WRatio,
+        processor=str.lower,
+        limit=len(names),
     )
-
-    rows = res.data or []
-    rows.sort(
-        key=lambda o: (
-            -similarity(query, o.get("organization_name") or ""),
-            len(o.get("organization_name") or ""),
-        )
-    )
-    return rows
-
-@st.cache_data(ttl=60)
-def get_requests_for_org(org_id: int):
-    res = (
-        client.table("requests")
-        .select(
-            "organization_id, organization_year_id, team_name, date_requested, tag_level, event_name, "
-            "start_date_calendar_year, start_date, event_schedule_group_id, event_id, "
-            "accountingregionid, accountinggroupid, orgcontactname, orgcontactemail, "
-            "orgcontactphone, registration_status, updated_at"
-        )
-        .eq("organization_id", org_id)
-        .order("start_date", desc=False)
-        .execute()
-    )
-    return res.data or []
-
-def with_all(options):
-    opts = sorted([o for o in options if o not in (None, "", "nan")])
-    return ["All"] + opts
-
-def apply_dropdown_filters(d: pd.DataFrame, status_choice: str, event_choice: str) -> pd.DataFrame:
-    out = d.copy()
-    if status_choice != "All":
-        out = out[out["registration_status"] == status_choice]
-    if event_choice != "All":
-        out = out[out["event_name"] == event_choice]
-    return out
+    return [rows[i] for _, _, i in scored]
 
 # ----------------------------
 # Org Insights
@@ -156,8 +80,7 @@ def render_org_insights(selected_org, org_id: int):
     org_name = selected_org.get("organization_name", "(no name)")
     st.markdown(f'### {org_name} — Org ID: {pg_org_link(org_id)}', unsafe_allow_html=True)
 
-    data = get_requests_for_org(org_id)
-    df = pd.DataFrame(data)
+    df = get_requests_df_for_org(org_id)
 
     if df.empty:
         st.info("No requests found for this org.")
@@ -165,20 +88,16 @@ def render_org_insights(selected_org, org_id: int):
 
     st.markdown("### Contact")
 
-    contact_row = df[df["orgcontactname"].notna()].head(1)
-    if contact_row.empty:
+    contact_name = get_org_contact(org_id)
+    if contact_name is None:
         st.caption("No contact info found for this org.")
     else:
-        st.write(contact_row.iloc[0]["orgcontactname"])
-
-    df["start_date_calendar_year"] = pd.to_numeric(df.get("start_date_calendar_year"), errors="coerce")
-    df["start_date"] = pd.to_datetime(df.get("start_date"), errors="coerce").dt.date
-    df["date_requested"] = pd.to_datetime(df.get("date_requested"), errors="coerce").dt.date
+        st.write(contact_name)
 
     st.markdown("### Filters")
 
-    status_options = with_all(df["registration_status"].dropna().unique())
-    event_options = with_all(df["event_name"].dropna().unique())
+    status_options = with_all(df["registration_status"].cat.categories)
+    event_options = with_all(df["event_name"].cat.categories)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -188,16 +107,35 @@ def render_org_insights(selected_org, org_id: int):
 
     df = apply_dropdown_filters(df, status_choice, event_choice)
 
-    df_2025 = df[df["start_date_calendar_year"] == 2025]
-    df_2026 = df[df["start_date_calendar_year"] == 2026]
+    year = df["start_date_calendar_year"].to_numpy(dtype="int16", na_value=0)
+    # Buckets: 0 = 2025, 1 = 2026, 2 = other.
+    bucket = np.where(year == 2025, 0, np.where(year == 2026, 1, 2))
+    count_2025, count_2026, _ = np.bincount(bucket, minlength=3).tolist()
 
     s2, s3 = st.columns(2)
     with s2:
-        st.metric("2025 Requests", len(df_2025))
+        st.metric("2025 Requests", count_2025)
     with s3:
-        st.metric("2026 Requests", len(df_2026), delta=len(df_2026) - len(df_2025))
-
-    st.dataframe(df, use_container_width=True)
+        st.metric("2026 Requests", count_2026, delta=count_2026 - count_2025)
+
+    cols_show = [
+        "organization_id",
+        "team_name",
+        "date_requested",
+        "tag_level",
+        "event_name",
+        "start_date_calendar_year",
+        "start_date",
+        "event_schedule_group_id",
+        "event_id",
+        "orgcontactname",
+        "orgcontactemail",
+        "orgcontactphone",
+        "registration_status",
+        "updated_at",
+    ]
+
+    st.dataframe(df[cols_show], use_container_width=True, column_config=DATE_COLUMNS)
 
 # ----------------------------
 # Search UI
@@ -260,14 +198,11 @@ with p2:
 with p3:
     st.caption(f"Showing {start+1}-{end} of {total} (Page {page+1} / {total_pages})")
 
-options = [
-    f'{o["organization_id"]} — {o.get("organization_name","(no name)")} ({o.get("org_city","")}, {o.get("org_state","")})'
-    for o in page_rows
-]
+options_map = {org_label(o): o for o in page_rows}
 
 choice = st.radio(
     "Select the correct organization",
-    ["-- Select an organization --"] + options,
+    ["-- Select an organization --"] + list(options_map),
     index=0,
     key="org_pick",
 )
@@ -275,7 +210,7 @@ choice = st.radio(
 if choice == "-- Select an organization --":
     st.stop()
 
-selected_org = page_rows[options.index(choice)]
+selected_org = options_map[choice]
 org_id = int(selected_org["organization_id"])
 
 render_org_insights(selected_org, org_id)
\ No newline at end of file
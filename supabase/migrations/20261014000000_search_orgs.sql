@@ -0,0 +1,22 @@
+-- Fuzzy org name search ranked in Postgres (used by individual_search.py).
+create extension if not exists pg_trgm;
+
+create index if not exists orgs_organization_name_trgm_idx
+    on orgs using gin (organization_name gin_trgm_ops);
+
+create or replace function search_orgs(q text, lim int default 200)
+returns table (
+    organization_id orgs.organization_id%type,
+    organization_name orgs.organization_name%type,
+    org_city orgs.org_city%type,
+    org_state orgs.org_state%type
+)
+language sql
+stable
+as $$
+    select o.organization_id, o.organization_name, o.org_city, o.org_state
+    from orgs o
+    where o.organization_name ilike '%' || q || '%'
+    order by similarity(o.organization_name, q) desc, length(o.organization_name)
+    limit lim;
+$$;
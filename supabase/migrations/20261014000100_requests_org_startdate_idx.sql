@@ -0,0 +1,4 @@
+-- Serves get_requests_for_org (common.py): filter on organization_id, in the full
+-- ORDER BY used for paging (start_date, event_id, event_schedule_group_id, organization_year_id).
+create index if not exists requests_org_startdate_idx
+    on requests (organization_id, start_date, event_id, event_schedule_group_id, organization_year_id);